@@ -9,13 +9,12 @@ Tests the system with:
 """
 
 import json
-import yaml
 import os
 import re
 from typing import Dict, List
 from src.rag_model import RAGModel
-from src.tools_model import ToolsModel
 from src.router import Router
+from src.config_loader import load_config
 
 
 class EvaluationFramework:
@@ -25,13 +24,14 @@ class EvaluationFramework:
     
     def __init__(self, config_path: str = "config.yml"):
         self.rag_model = RAGModel(config_path=config_path)
-        self.tools_model = ToolsModel(config_path=config_path)
+        self.tools_model = self.rag_model.tools  # share RAGModel's tools (one forecast cache)
         
         # Initialize Router
         self.router = Router(
             rag_model=self.rag_model,
             tools_model=self.tools_model,
-            llm_callable=self.rag_model.llm_call
+            llm_callable=self.rag_model.llm_call,
+            json_llm_callable=self.rag_model.llm_call_json
         )
         
         # Load documents into RAG model
@@ -157,8 +157,7 @@ class EvaluationFramework:
     
     def _load_documents(self, config_path: str):
         """Load all fishing documents into the RAG pipeline"""
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config(config_path)
         
         base_path = config['documents']['base_path']
         sources = config['documents']['sources']
@@ -197,11 +196,9 @@ class EvaluationFramework:
             print(f"Type: {test_case['type']}")
             print(f"Reasoning: {test_case['reasoning']}\n")
             
-            # Get routing decision
-            routing_decision = self.router.route(test_case['question'])
-            
-            # Get system response
-            response = self.router.query_with_routing(test_case['question'])
+            # Get system response and the routing decision it actually used
+            # (the same fused route+answer path as the UI)
+            response, routing_decision = self.router.query_with_route_decision(test_case['question'])
             
             # Verify routing
             routing_correct = self._verify_routing(test_case, routing_decision)
@@ -289,11 +286,8 @@ class EvaluationFramework:
             print(f"Expected Failure: {test_case['expected_failure']}")
             print(f"Reasoning: {test_case['reasoning']}\n")
             
-            # Get routing decision
-            routing_decision = self.router.route(test_case['question'])
-            
-            # Get system response
-            response = self.router.query_with_routing(test_case['question'])
+            # Get system response and the routing decision it actually used
+            response, routing_decision = self.router.query_with_route_decision(test_case['question'])
             
             # Analyze failure
             failure_analysis = self._analyze_failure(test_case, routing_decision, response)
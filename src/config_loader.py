@@ -0,0 +1,49 @@
+"""
+
+Config Loader
+
+Parses config.yml once per process and shares the result
+between RAGModel, ToolsModel, MainWindow and the evaluation.
+Also loads the .env file once per process.
+
+"""
+
+import os
+import yaml
+from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Dict
+
+# libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Set in os.environ once .env has been read (survives module reloads)
+_DOTENV_LOADED_FLAG = "_TAS_FISHING_DOTENV_LOADED"
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(path: str, mtime: float) -> Dict:
+    """Parse the YAML file (mtime is part of the cache key so edits are picked up)"""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+def load_config(config_path: str = "config.yml") -> Dict:
+    """
+    Load configuration, reusing the parsed dict while the file is unchanged
+    
+    The returned dict is shared between callers, treat it as read-only.
+    """
+    path = os.path.abspath(config_path)
+    return _load_config_cached(path, os.path.getmtime(path))
+
+
+def load_env():
+    """Load variables from the .env file, only on the first call per process"""
+    if os.environ.get(_DOTENV_LOADED_FLAG):
+        return
+    load_dotenv()
+    os.environ[_DOTENV_LOADED_FLAG] = "1"
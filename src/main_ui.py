@@ -9,26 +9,25 @@ Library:
 
 import os
 import gradio as gr
-import yaml
 
 from src.rag_model import RAGModel
-from src.tools_model import ToolsModel
 from src.router import Router
+from src.config_loader import load_config
 from src.prompts import UI_MESSAGES, EXAMPLE_QUERIES
 
 class MainWindow:
     def __init__(self, config_path: str = "config.yml"):
         """ Initialize the chatbot application """
         # Load config
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
             
         # Initialize bot
         self.rag = RAGModel(config_path=config_path)
-        self.tools = ToolsModel(config_path=config_path)
+        self.tools = self.rag.tools  # share RAGModel's tools (one forecast cache)
         
         # Initialize Router
-        self.router = Router(rag_model=self.rag, tools_model=self.tools, llm_callable=self.rag.llm_call)
+        self.router = Router(rag_model=self.rag, tools_model=self.tools, llm_callable=self.rag.llm_call,
+                             json_llm_callable=self.rag.llm_call_json)
         
         # Load docs
         self._load_documents()
@@ -6,26 +6,106 @@ Implementation of RAG: Retrieve information from documents (source of truth)
 
 import os
 import json
+import time
+import threading
 os.environ["TOKENIZERS_PARALLELISM"] = "false"  # Fix tokenizer warning
-import yaml
-from groq import Groq
-from google import genai
-from dotenv import load_dotenv
 import chromadb
 from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
-from typing import List, Tuple, Dict
+from functools import lru_cache, cached_property
+from typing import List, Tuple, Dict, Iterable
 
 from src.tools_model import ToolsModel
+from src.config_loader import load_config, load_env
+
+
+@lru_cache(maxsize=None)
+def get_embedding_function(model_name: str) -> SentenceTransformerEmbeddingFunction:
+    """Shared embedding function so the SentenceTransformer weights are loaded once per process"""
+    return SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+
+def _first_json_object(chunks: Iterable[str]) -> str:
+    """Consume streamed text until the first top-level JSON object closes, return the text so far"""
+    buf = []
+    depth, started, in_string, escaped = 0, False, False, False
+    
+    for chunk in chunks:
+        buf.append(chunk)
+        for ch in chunk:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '{':
+                depth += 1
+                started = True
+            elif not started:
+                continue
+            elif ch == '"':
+                in_string = True
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return "".join(buf)
+    
+    return "".join(buf)
+
+
+def _groq_retryable_errors() -> tuple:
+    """Groq errors worth retrying: 429s, connection errors/timeouts and 5xx responses"""
+    from groq import RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+    return (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retry `attempt`: the server's Retry-After if sent, else exponential backoff"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), 60.0)
+        except ValueError:
+            pass  # HTTP-date form, fall back to backoff
+    return min(0.5 * 2 ** attempt, 8)
+
+
+class RateLimiter:
+    """Token bucket: allows `rate` units per `period` seconds, callers over the limit wait"""
+    def __init__(self, rate: float, period: float = 60.0):
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    
+    def reserve(self, amount: float = 1) -> float:
+        """Take `amount` units from the bucket and return the seconds to wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.fill_rate
+    
+    
+    def acquire(self, amount: float = 1):
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
 
 class RAGModel:
     def __init__(self, config_path: str = "config.yml"):
         # Load env variables from .env file
-        load_dotenv()
+        load_env()
         
         
         # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         
         # Get API keys from environment
@@ -36,12 +116,20 @@ class RAGModel:
             raise ValueError("API keys not found in .env file")
         
         
-        # Initialize clients
-        self.groq_client = Groq(api_key=groq_api_key)
-        self.gemini_client = genai.Client(api_key=gemini_api_key)
+        # Clients are created on first use (see the *_client properties)
+        self._groq_api_key = groq_api_key
+        self._gemini_api_key = gemini_api_key
         
         self.default_provider = self.config['llm']['default_provider']
         
+        # Groq rate limits: bursts queue instead of failing with 429 (a limit <= 0 disables it)
+        groq_config = self.config['llm']['groq']
+        self.groq_max_retries = groq_config.get('max_retries', 3)
+        requests_per_minute = groq_config.get('requests_per_minute', 28)
+        tokens_per_minute = groq_config.get('tokens_per_minute', 0)
+        self._groq_requests = RateLimiter(requests_per_minute) if requests_per_minute > 0 else None
+        self._groq_tokens = RateLimiter(tokens_per_minute) if tokens_per_minute > 0 else None
+        
         
         # Tools calling
         self.tools = ToolsModel(config_path=config_path)
@@ -49,7 +137,7 @@ class RAGModel:
         
         # Initialize ChromaDB
         self.chroma_client = chromadb.Client()
-        self.embedding_function = SentenceTransformerEmbeddingFunction(model_name=self.config['rag']['embedding']['model'])
+        self.embedding_function = get_embedding_function(self.config['rag']['embedding']['model'])
         
         
         # Create or get collection
@@ -59,6 +147,20 @@ class RAGModel:
         )
         
     
+    @cached_property
+    def groq_client(self):
+        """Groq client, built on first use (all retries are handled by _groq_chat)"""
+        from groq import Groq
+        return Groq(api_key=self._groq_api_key, max_retries=0)
+    
+    
+    @cached_property
+    def gemini_client(self):
+        """Gemini client, built on first use"""
+        from google import genai
+        return genai.Client(api_key=self._gemini_api_key)
+    
+    
     def load_ground_truth(self, file_path: str, source_name: str = None) -> int:
         """
         Load JSON document and prepare it for chunking
@@ -81,9 +183,9 @@ class RAGModel:
         chunk_size = self.config['rag']['chunk_size']
         chunk_overlap = self.config['rag']['chunk_overlap']
         
-        total_chunks = 0
+        ids, documents, metadatas = [], [], []
         
-        # Process each section separately
+        # Chunk each section separately
         for section_name, section_content in data.items():
             # Convert JSON to readable text
             section_text = self._json_to_text(section_content, section_name)
@@ -91,11 +193,16 @@ class RAGModel:
             # Chunk the text
             chunks = self.chunk_text(section_text, chunk_size, chunk_overlap)
             
-            # Upsert to vector database
-            self.upsert(chunks, source_name, section_name)
-            
-            total_chunks += len(chunks)
+            section_ids, section_metadatas = self._build_records(chunks, source_name, section_name)
+            ids.extend(section_ids)
+            documents.extend(chunks)
+            metadatas.extend(section_metadatas)
         
+        # Single upsert so all chunks are embedded in one batch
+        if ids:
+            self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas)
+        
+        total_chunks = len(ids)
         print(f"✅ Loaded {total_chunks} chunks from {source_name} across {len(data)} sections")
         return total_chunks
      
@@ -144,10 +251,20 @@ class RAGModel:
         """
         Add chunks to ChromaDB with metadata
         """
-        # Create unique IDs
+        ids, metadatas = self._build_records(chunks, source_name, section_name)
+        
+        # Upsert to ChromaDB
+        self.collection.upsert(
+            ids=ids,
+            documents=chunks,
+            metadatas=metadatas
+        )
+    
+    
+    def _build_records(self, chunks: List[str], source_name: str, section_name: str) -> Tuple[List[str], List[Dict]]:
+        """Helper: Create unique IDs and metadata for a section's chunks"""
         ids = [f"{source_name}:{section_name}:{i}" for i in range(len(chunks))]
         
-        # Create metadata for each chunk
         metadatas = [
             {
                 "source": source_name,
@@ -158,12 +275,7 @@ class RAGModel:
             for i, chunk in enumerate(chunks)
         ]
         
-        # Upsert to ChromaDB
-        self.collection.upsert(
-            ids=ids,
-            documents=chunks,
-            metadatas=metadatas
-        )
+        return ids, metadatas
 
 
     def _extract_topics(self, chunk: str, section: str) -> str:
@@ -232,11 +344,12 @@ class RAGModel:
         if filter_metadata is None:
             filter_metadata = self._create_query_filter(query)
         
-        # Query ChromaDB
+        # Query ChromaDB (only fetch the fields we return)
         results = self.collection.query(
             query_texts=[query],
             n_results=k,
-            where=filter_metadata
+            where=filter_metadata,
+            include=["documents", "metadatas"]
         )
         
         # Return as list of tuples
@@ -273,27 +386,101 @@ class RAGModel:
         return None
     
    
-    def llm_call(self, prompt: str, use_groq: bool = None) -> str:
-        """Call LLM with prompt"""
+    def llm_call(self, prompt: str, use_groq: bool = None, system: str = None) -> str:
+        """
+        Call LLM with prompt
+        
+        A static `system` prompt is sent ahead of the user prompt so the
+        provider's prefix caching can reuse it across calls.
+        """
         if use_groq is None:
             use_groq = (self.default_provider == "groq")
         
         if use_groq:
-            response = self.groq_client.chat.completions.create(
-                model=self.config['llm']['groq']['model'],
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.config['llm']['groq']['temperature'],
-                max_tokens=self.config['llm']['groq']['max_tokens']
-            )
-            return response.choices[0].message.content
+            return self._groq_chat(prompt, system)
         else:
             response = self.gemini_client.models.generate_content(
                 model=self.config['llm']['germini']['model'],
-                contents=prompt
+                contents=prompt,
+                config=self._gemini_config(system)
             )
             return response.text
     
     
+    def llm_call_json(self, prompt: str, use_groq: bool = None, system: str = None) -> str:
+        """
+        Call LLM for a JSON-only reply (routing), streaming the response
+        and stopping as soon as the JSON object is complete
+        """
+        if use_groq is None:
+            use_groq = (self.default_provider == "groq")
+        
+        if use_groq:
+            return self._groq_chat(prompt, system, stop_after_json=True)
+        else:
+            stream = self.gemini_client.models.generate_content_stream(
+                model=self.config['llm']['germini']['model'],
+                contents=prompt,
+                config=self._gemini_config(system)
+            )
+            return _first_json_object(chunk.text or "" for chunk in stream)
+    
+    
+    def _gemini_config(self, system: str = None):
+        """Helper: Gemini request config carrying the system prompt, if any"""
+        if not system:
+            return None
+        from google.genai import types
+        return types.GenerateContentConfig(system_instruction=system)
+    
+    
+    def _groq_request(self, prompt: str, system: str = None) -> Tuple[Dict, int]:
+        """Helper: Build Groq chat kwargs and an estimate of the tokens they consume"""
+        groq_config = self.config['llm']['groq']
+        
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        
+        request = {
+            "model": groq_config['model'],
+            "messages": messages,
+            "temperature": groq_config['temperature'],
+            "max_tokens": groq_config['max_tokens'],
+        }
+        # ~4 characters per token for the prompt, plus the completion budget
+        est_tokens = (len(prompt) + len(system or "")) // 4 + groq_config['max_tokens']
+        return request, est_tokens
+    
+    
+    def _groq_chat(self, prompt: str, system: str = None, stop_after_json: bool = False) -> str:
+        """Rate-limited Groq call, retrying 429s, connection errors and 5xx responses with backoff"""
+        retryable = _groq_retryable_errors()
+        
+        request, est_tokens = self._groq_request(prompt, system)
+        
+        for attempt in range(self.groq_max_retries + 1):
+            if self._groq_requests:
+                self._groq_requests.acquire()
+            if self._groq_tokens:
+                self._groq_tokens.acquire(est_tokens)
+            try:
+                if stop_after_json:
+                    # Stream and close the connection once the JSON object is complete
+                    stream = self.groq_client.chat.completions.create(**request, stream=True)
+                    try:
+                        return _first_json_object(c.choices[0].delta.content or "" for c in stream if c.choices)
+                    finally:
+                        stream.close()
+                
+                response = self.groq_client.chat.completions.create(**request)
+                return response.choices[0].message.content
+            except retryable as e:
+                if attempt == self.groq_max_retries:
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+    
+    
     def verify_retrieval(self, citation: str, retrievals: List[Tuple]) -> bool:
         """
         Check if citation is included in retrieved results
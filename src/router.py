@@ -9,12 +9,29 @@ Rounting logic to retrieve information
 
 """
 
+import copy
 import json
 import re
-from typing import Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
-from src.prompts import ROUTING_PROMPT, RAG_ANSWER_PROMPT, UI_MESSAGES, TOOL_INTEGRATION_PROMPT, TOOL_ANSWER_PROMPTS, GENERAL_CHAT_RESPONSES, GENERAL_CHAT_PROMPT
+from src.prompts import ROUTING_SYSTEM_PROMPT, ROUTING_USER_PROMPT, RAG_ANSWER_PROMPT, UI_MESSAGES, TOOL_INTEGRATION_PROMPT, TOOL_ANSWER_PROMPTS, GENERAL_CHAT_RESPONSES, GENERAL_CHAT_PROMPT, ROUTE_AND_ANSWER_SYSTEM_PROMPT, ROUTE_AND_ANSWER_USER_PROMPT
+from src.rag_model import _first_json_object
+
+# Routing JSON extraction (fenced ```json block, else the outermost {...})
+_JSON_FENCE_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Fused replies: what may sit between the routing JSON and the answer
+# (a closing code fence and/or a "---" separator line)
+_FUSED_ANSWER_PREFIX_RE = re.compile(r'\A\s*(?:```[ \t]*(?:\r?\n|\Z))?(?:[ \t]*---[ \t]*(?:\r?\n|\Z))?')
+
+# Fixed part of the decision used when routing fails (tool_params/reasoning added per call)
+_FALLBACK_RAG_ROUTE = {'needs_rag': True, 'needs_tool': False, 'tool_name': None}
+
 
 class RouteType(Enum):
     """ Types of routes that router can take """
@@ -32,85 +49,161 @@ class Router:
     """
     
     
-    def __init__(self, rag_model, tools_model, llm_callable):
+    def __init__(self, rag_model, tools_model, llm_callable, json_llm_callable=None):
         """ Initialize router with RAG and Tools models """
         
         self.rag = rag_model
         self.tools = tools_model
         self.llm = llm_callable
+        self.llm_json = json_llm_callable or llm_callable  # JSON-only replies (routing)
+        
+        # Router settings
+        self.router_config = self.rag.config.get('router', {})
+        self.fuse_rag_answer = self.router_config.get('fuse_rag_answer', True)
+        
+        # LRU cache of routing decisions (normalized query hash -> decision)
+        self.route_cache_size = self.router_config.get('route_cache_size', 256)
+        self._route_cache = OrderedDict()
+        self._route_cache_lock = threading.Lock()
+        
+        # Cap on the query text sent in routing prompts (~4 characters per token)
+        self.max_query_chars = self.router_config.get('max_query_tokens', 512) * 4
         
     
     def route(self, query: str) -> Dict:  
+        cached = self._get_cached_route(query)
+        if cached is not None:
+            return cached
+        
         return self._llm_route(query)
     
     
     def _llm_route(self, query: str) -> Dict:
         """ Use LLM to make routing decision for complex queries """
         
-        prompt = ROUTING_PROMPT.format(query=query)
+        prompt = ROUTING_USER_PROMPT.format(query=self._truncate_query(query))
         
         try:
-            response = self.llm(prompt)
-            m = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-            raw = m.group(1) if m else response
+            response = self.llm_json(prompt, system=ROUTING_SYSTEM_PROMPT)
+            decision = self._parse_routing_response(response)
+        except Exception as e:
+            return self._fallback_route(e)
+        
+        self._cache_route(query, decision)
+        return decision
+    
+    
+    def _truncate_query(self, query: str) -> str:
+        """ Cut overly long queries down to the routing prompt budget """
+        if len(query) <= self.max_query_chars:
+            return query
+        return query[:self.max_query_chars] + " …[truncated]"
+    
+    
+    def _route_cache_key(self, query: str) -> bytes:
+        """ Hash of the normalized query (case and whitespace insensitive) """
+        normalized = " ".join(query.lower().split())
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+    
+    
+    def _get_cached_route(self, query: str) -> Optional[Dict]:
+        """ Return a copy of a cached routing decision, or None on a miss """
+        if self.route_cache_size <= 0:
+            return None
+        
+        key = self._route_cache_key(query)
+        with self._route_cache_lock:
+            decision = self._route_cache.get(key)
+            if decision is None:
+                return None
+            self._route_cache.move_to_end(key)
+        
+        return {**copy.deepcopy(decision), 'cache_hit': True}
+    
+    
+    def _cache_route(self, query: str, decision: Dict):
+        """ Store a routing decision, evicting the least recently used one """
+        if self.route_cache_size <= 0:
+            return
+        
+        # day_offset is relative to the day it was computed ("weekend" asked on
+        # Monday vs Friday), so those decisions must be routed afresh each time
+        if 'day_offset' in (decision.get('tool_params') or {}):
+            return
+        
+        key = self._route_cache_key(query)
+        with self._route_cache_lock:
+            self._route_cache[key] = copy.deepcopy(decision)
+            self._route_cache.move_to_end(key)
+            while len(self._route_cache) > self.route_cache_size:
+                self._route_cache.popitem(last=False)
+    
+    
+    def _parse_routing_response(self, response: str) -> Dict:
+        """ Parse the LLM's routing JSON into a route decision """
+        m = _JSON_FENCE_RE.search(response)
+        raw = m.group(1) if m else response
 
-            if not raw.strip().startswith('{'):
-                brace = re.search(r'\{.*\}', raw, re.DOTALL)
-                raw = brace.group(0) if brace else '{}'
+        if not raw.lstrip().startswith('{'):
+            brace = _JSON_OBJECT_RE.search(raw)
+            raw = brace.group(0) if brace else '{}'
 
-            decision = json.loads(raw)
-            needs_rag = bool(decision.get('needs_rag'))
-            needs_tool = bool(decision.get('needs_tool'))
-            if needs_rag and needs_tool:
-                route_type = RouteType.RAG_AND_TOOL
-            elif needs_tool:
-                route_type = RouteType.TOOL_ONLY
-            elif needs_rag:
-                route_type = RouteType.RAG_ONLY
-            else:
-                route_type = RouteType.GENERAL_CHAT
+        decision = json.loads(raw)
+        needs_rag = bool(decision.get('needs_rag'))
+        needs_tool = bool(decision.get('needs_tool'))
+        if needs_rag and needs_tool:
+            route_type = RouteType.RAG_AND_TOOL
+        elif needs_tool:
+            route_type = RouteType.TOOL_ONLY
+        elif needs_rag:
+            route_type = RouteType.RAG_ONLY
+        else:
+            route_type = RouteType.GENERAL_CHAT
 
-            return {
-                'route_type': route_type,
-                'needs_rag': needs_rag,
-                'needs_tool': needs_tool,
-                'tool_name': decision.get('tool_name'),
-                'tool_params': decision.get('tool_params') or {},
-                'reasoning': decision.get('reasoning', 'LLM routing decision')
-            }
-        except Exception as e:
-            print(f"LLM routing failed: {e}, defaulting to RAG")
-            return { 'route_type': RouteType.RAG_ONLY, 'needs_rag': True,
-                    'needs_tool': False, 'tool_name': None, 'tool_params': {},
-                    'reasoning': f'Fallback to RAG due to routing error: {e}' }
+        return {
+            'route_type': route_type,
+            'needs_rag': needs_rag,
+            'needs_tool': needs_tool,
+            'tool_name': decision.get('tool_name'),
+            'tool_params': decision.get('tool_params') or {},
+            'reasoning': decision.get('reasoning', 'LLM routing decision')
+        }
+    
+    
+    def _fallback_route(self, error: Exception) -> Dict:
+        """ Default to RAG when the routing decision can't be obtained """
+        print(f"LLM routing failed: {error}, defaulting to RAG")
+        return {'route_type': RouteType.RAG_ONLY, **_FALLBACK_RAG_ROUTE, 'tool_params': {},
+                'reasoning': f'Fallback to RAG due to routing error: {error}'}
             
             
-    def execute_route(self, query: str, route_decision: Dict) -> str:
-        """ Execute the routing decision and generate response """
+    def execute_route(self, query: str, route_decision: Dict, retrievals: List[Tuple] = None) -> str:
+        """ Execute the routing decision and generate response (reusing `retrievals` if already searched) """
         print(f"DEBUG: Route decision: {route_decision}")
         
         route_type = route_decision['route_type']
         
+        # Lowercase once; every keyword check downstream reuses it
+        query_lower = query.lower()
+        
         if route_type == RouteType.GENERAL_CHAT:
-            return self._handle_general_chat(query)
+            return self._handle_general_chat(query, query_lower)
         
         elif route_type == RouteType.RAG_ONLY:
-            return self._handle_rag_only(query)
+            return self._handle_rag_only(query, query_lower, retrievals)
         
         elif route_type == RouteType.TOOL_ONLY:
-            return self._handle_tool_only(query, route_decision)
+            return self._handle_tool_only(query, query_lower, route_decision)
         
         elif route_type == RouteType.RAG_AND_TOOL:
-            return self._handle_rag_and_tool(query, route_decision)
+            return self._handle_rag_and_tool(query, query_lower, route_decision, retrievals)
         
         else:
             return UI_MESSAGES['error']
             
     
-    def _handle_general_chat(self, query: str) -> str:
+    def _handle_general_chat(self, query: str, query_lower: str) -> str:
         """Handle casual conversation """
-        query_lower = query.lower()
-        
         # Quick pattern matching for common greetings
         if any(word in query_lower for word in ['hello', 'hi', 'hey']) and len(query_lower) < 20:
             return GENERAL_CHAT_RESPONSES['greeting']
@@ -131,20 +224,17 @@ class Router:
             return response
     
     
-    def _handle_rag_only(self, query: str) -> str:
+    def _handle_rag_only(self, query: str, query_lower: str, retrievals: List[Tuple] = None) -> str:
         """Handle queries using only RAG"""
-        # Search documents
-        q_norm = self.tools.normalize_text_species(query) if hasattr(self.tools, "normalize_text_species") else query
-        retrievals = self.rag.search(q_norm)
+        # Search documents (unless the fused path already did)
+        if retrievals is None:
+            retrievals = self._search(query)
         
         if not retrievals:
             return UI_MESSAGES['no_answer']
         
         # Format context
-        context = "\n\n".join([
-            f"[Source: {meta['source']}/{meta.get('section', 'general')}]\n{doc}"
-            for _, doc, meta in retrievals
-        ])
+        context = self._format_context(retrievals)
         
         # Generate answer
         prompt = RAG_ANSWER_PROMPT.format(
@@ -155,12 +245,12 @@ class Router:
         answer = self.llm(prompt)
         
         # Make answer more interactive
-        answer = self._enhance_answer_interactivity(answer, query)
+        answer = self._enhance_answer_interactivity(answer, query_lower)
         
         return answer
 
     
-    def _handle_tool_only(self, query: str, route_decision: Dict) -> str:
+    def _handle_tool_only(self, query: str, query_lower: str, route_decision: Dict) -> str:
         tool_name = route_decision['tool_name']
         params = route_decision.get('tool_params') or {}
 
@@ -174,26 +264,33 @@ class Router:
             tool_json = json.dumps(result.get("error", {}), ensure_ascii=False)
             prompt = TOOL_ANSWER_PROMPTS.format(query=query, tool_json=tool_json)
             text = self.llm(prompt)
-            return self._enhance_answer_interactivity(text, query)
+            return self._enhance_answer_interactivity(text, query_lower)
+
+        # Structured results with a formatter don't need the LLM to phrase them;
+        # the formatter returns None when it can't cover the request (e.g. a day_offset
+        # outside the forecast) and the LLM answers instead
+        formatter = getattr(self.tools, "result_formatters", {}).get(tool_name)
+        if formatter is not None:
+            text = formatter(result["data"], params)
+            if text is not None:
+                return self._enhance_answer_interactivity(text, query_lower)
 
         tool_json = json.dumps(result["data"], ensure_ascii=False)
         prompt = TOOL_ANSWER_PROMPTS.format(query=query, tool_json=tool_json)
         text = self.llm(prompt)
         
-        return self._enhance_answer_interactivity(text, query)
+        return self._enhance_answer_interactivity(text, query_lower)
     
     
-    def _handle_rag_and_tool(self, query: str, route_decision: Dict) -> str:
+    def _handle_rag_and_tool(self, query: str, query_lower: str, route_decision: Dict, retrievals: List[Tuple] = None) -> str:
         """Handle queries using both RAG and Tools"""
         try:
-            # Get RAG context
-            q_norm = self.tools.normalize_text_species(query) if hasattr(self.tools, "normalize_text_species") else query
-            retrievals = self.rag.search(q_norm)
+            # Get RAG context (unless the fused path already did)
+            if retrievals is None:
+                retrievals = self._search(query)
             
             
-            context = "\n\n".join(
-                f"[Source: {m['source']}/{m.get('section', 'general')}]\n{doc}" for _, doc, m in retrievals
-            ) if retrievals else "No relevant documents found."
+            context = self._format_context(retrievals) if retrievals else "No relevant documents found."
 
             
             # Call tool
@@ -213,7 +310,7 @@ class Router:
             )
             text = self.llm(prompt)
             
-            return self._enhance_answer_interactivity(text, query)
+            return self._enhance_answer_interactivity(text, query_lower)
         
         except Exception as e:
             print(f"Error in _handle_rag_and_tool: {e}")
@@ -222,10 +319,22 @@ class Router:
             return UI_MESSAGES['error']
     
     
-    def _enhance_answer_interactivity(self, answer: str, query: str) -> str:
+    def _search(self, query: str) -> List[Tuple]:
+        """Helper: Search documents for the (species-normalized) query"""
+        q_norm = self.tools.normalize_text_species(query) if hasattr(self.tools, "normalize_text_species") else query
+        return self.rag.search(q_norm)
+    
+    
+    def _format_context(self, retrievals) -> str:
+        """ Build the cited context block for the LLM in a single join pass """
+        return "\n\n".join(
+            f"[Source: {meta['source']}/{meta.get('section', 'general')}]\n{doc}"
+            for _, doc, meta in retrievals
+        )
+    
+    
+    def _enhance_answer_interactivity(self, answer: str, query_lower: str) -> str:
         """ Add interactive elements to make answers more engaging """
-        query_lower = query.lower()
-        
         suggestions = []
         
         if 'bag limit' in query_lower or 'how many' in query_lower:
@@ -254,7 +363,59 @@ class Router:
     
     def query_with_routing(self, query: str) -> str:
         """ Complete query pipeline with routing """
-        route_decision = self.route(query)
+        answer, _ = self.query_with_route_decision(query)
+        return answer
+    
+    
+    def query_with_route_decision(self, query: str) -> Tuple[str, Dict]:
+        """ query_with_routing, also returning the routing decision it actually used """
+        cached = self._get_cached_route(query)
+        if cached is not None:
+            return self.execute_route(query, cached), cached
+        
+        if self.fuse_rag_answer:
+            return self._fused_route_and_answer(query)
+        
+        route_decision = self._llm_route(query)
         answer = self.execute_route(query, route_decision)
         
-        return answer
\ No newline at end of file
+        return answer, route_decision
+    
+    
+    def _fused_route_and_answer(self, query: str) -> Tuple[str, Dict]:
+        """
+        Route and answer RAG-only questions with a single LLM call
+        
+        Retrieval runs speculatively before routing, so the model can confirm
+        the route and answer from the context in the same response. Any other
+        route falls back to execute_route with the decision already parsed.
+        """
+        try:
+            retrievals = self._search(query)
+        except Exception as e:
+            # Retrieval is broken (e.g. documents failed to load): plain routing still
+            # serves tool-only and general chat questions
+            print(f"Speculative search failed, routing without it: {e}")
+            route_decision = self._llm_route(query)
+            return self.execute_route(query, route_decision), route_decision
+        context = self._format_context(retrievals) if retrievals else "No relevant documents found."
+        
+        prompt = ROUTE_AND_ANSWER_USER_PROMPT.format(query=self._truncate_query(query), context=context)
+        response = self.llm(prompt, system=ROUTE_AND_ANSWER_SYSTEM_PROMPT)
+        
+        # Routing JSON is the first balanced object; whatever follows is the answer
+        decision_text = _first_json_object(response)  # scans character by character
+        answer = _FUSED_ANSWER_PREFIX_RE.sub("", response[len(decision_text):], count=1)
+        
+        try:
+            route_decision = self._parse_routing_response(decision_text)
+            self._cache_route(query, route_decision)
+        except Exception as e:
+            route_decision = self._fallback_route(e)
+        
+        answer = answer.strip()
+        if route_decision['route_type'] == RouteType.RAG_ONLY and retrievals and answer:
+            return self._enhance_answer_interactivity(answer, query.lower()), route_decision
+        
+        # Slow path: the model chose another route (or skipped the answer)
+        return self.execute_route(query, route_decision, retrievals), route_decision
\ No newline at end of file
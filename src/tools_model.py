@@ -9,24 +9,113 @@ when out of scope of RAG model.
 
 import os
 import re
+import copy
+import math
+import inspect
+import bisect
 import json
-import yaml
+import time
+import threading
 import requests
-from datetime import datetime, timezone, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlencode, quote_plus
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, Optional, List
-from dotenv import load_dotenv
 
 from src.prompts import TOOL_ANSWER_PROMPTS, TOOL_ERROR_MESSAGES, TOOL_DESCRIPTIONS
+from src.config_loader import load_config, load_env
+
+
+# Fishing score lookup tables: points[bisect_right(edges, value)]
+# Temperature bands are closed on both ends ([10, 25] is ideal), so the upper
+# edges sit just above 25/30/35
+_TEMP_EDGES = (0, 5, 10, math.nextafter(25, math.inf), math.nextafter(30, math.inf), math.nextafter(35, math.inf))
+_TEMP_POINTS = (0, 1, 2, 4, 2, 1, 0)
+_WIND_EDGES = (15, 25, 35)   # km/h
+_WIND_POINTS = (3, 2, 1, 0)
+_RAIN_EDGES = (2, 10, 20)    # mm
+_RAIN_POINTS = (3, 2, 1, 0)
+
+# Best-day rating by minimum fishing score, highest first
+_RATINGS = ((8, "Excellent", "🎣✨"), (6, "Good", "🎣"), (4, "Fair", "⚠️"), (0, "Poor", "❌"))
+
+# Multi-day outlook by average fishing score: _OUTLOOKS[bisect_right(edges, avg)]
+_OUTLOOK_EDGES = (3, 5, 7)
+_OUTLOOKS = (
+    "Challenging conditions expected",
+    "Mixed conditions throughout the period",
+    "Generally good conditions expected",
+    "Great week ahead for fishing!",
+)
+
+# Weather answer templates (day is a datetime)
+_HEADER_TMPL = "🎣 **Fishing forecast for {location}**\n\n{recommendation}"
+_STALE_TMPL = "\n⚠️ *Live weather is unavailable right now, so this forecast is from {stale_minutes} minutes ago and may be out of date.*"
+_BEST_DAY_TMPL = (
+    "\n**Best Day: {day:%A}, {day:%b} {day.day}** - {rating} conditions {emoji}\n"
+    "• Temperature: {temp_c}°C\n"
+    "• Wind: {wind_kmh} km/h\n"
+    "• Rain: {rain_mm} mm\n"
+    "• Score: {score}/10"
+)
+_DAY_DETAILS_TMPL = (
+    "• Temperature: {temp_min_c}°C - {temp_max_c}°C (avg {temp_avg_c}°C)\n"
+    "• Conditions: {conditions}\n"
+    "• Wind: {wind_speed_kmh} km/h\n"
+    "• Rainfall: {rainfall_mm} mm\n"
+    "• Fishing score: {fishing_score}/10"
+)
+_DAY_TMPL = "\n**{day:%A} ({day:%b} {day.day}):**\n" + _DAY_DETAILS_TMPL
+_SINGLE_DAY_TMPL = (
+    "🎣 **Fishing forecast for {location}, {day:%A} ({day:%b} {day.day})**\n\n"
+    "{rating} conditions {emoji}\n"
+) + _DAY_DETAILS_TMPL
+
+# Pooled keep-alive session shared by every ToolsModel; retries transient 429/5xx responses
+# on idempotent GETs only, and caps open sockets per host. Read timeouts are not retried
+# and Retry-After is ignored, so a hung API costs one read timeout and the stale forecast
+# cache covers the outage instead of the chat turn blocking
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False
+    )
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+
+@lru_cache(maxsize=4096)
+def _iso_date_from_day(day_number: int) -> str:
+    """ISO date (YYYY-MM-DD) for a day count since the Unix epoch"""
+    return time.strftime('%Y-%m-%d', time.gmtime(day_number * 86400))
 
 
 class ToolsModel:
     """Collection of tools for Tasmania Fishing Chatbot"""
+    __slots__ = (
+        "config", "tools_config",
+        "weather_config", "weather_enabled", "weather_provider", "weather_api_key", "weather_base_url", "_forecast_url",
+        "weather_cache_ttl", "weather_cache_size", "weather_max_stale", "_wx_cache", "_wx_lock",
+        "_tool_registry", "_tool_params", "_tool_validators", "result_formatters",
+    )
+    
     def __init__(self, config_path: str = "config.yml"):
-        load_dotenv()
+        load_env()
         
         # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
             
         # Load tools configurations
         self.tools_config = self.config.get('tools', {})
@@ -34,6 +123,33 @@ class ToolsModel:
         # Initialize weather tool
         self._init_weather_tool()
         
+        # Forecast cache: (provider, location_query, days) -> (fetched_at, result)
+        self.weather_cache_ttl = self.weather_config.get('cache_ttl_sec', 1800)
+        self.weather_cache_size = self.weather_config.get('cache_max_entries', 256)
+        # Oldest forecast served (marked stale) when the API is down
+        self.weather_max_stale = max(self.weather_config.get('max_stale_sec', 21600), self.weather_cache_ttl)
+        self._wx_cache = {}
+        self._wx_lock = threading.Lock()
+        
+        # Tool registry: name -> callable, plus the parameters each accepts
+        self._tool_registry = {
+            "get_fishing_weather": self.get_fishing_weather,
+        }
+        self._tool_params = {
+            name: frozenset(inspect.signature(fn).parameters)
+            for name, fn in self._tool_registry.items()
+        }
+        
+        # Param validators: coerce LLM-produced values, raise ValueError when invalid
+        self._tool_validators = {
+            "get_fishing_weather": self._validate_weather_params,
+        }
+        
+        # Deterministic answer formatters (skip the LLM phrasing call)
+        self.result_formatters = {
+            "get_fishing_weather": self._format_weather_message,
+        }
+        
     
     def _init_weather_tool(self):
         """Initialize weather API settings"""
@@ -51,13 +167,24 @@ class ToolsModel:
                 'base_url', 
                 'https://api.openweathermap.org/data/2.5'
             )
+            
+            # Forecast URL with the static query params encoded once
+            static_params = urlencode({"appid": self.weather_api_key or "", "units": "metric"})
+            self._forecast_url = f"{self.weather_base_url}/forecast?{static_params}"
         else:
             self.weather_api_key = None
             self.weather_base_url = None
+            self._forecast_url = None
+    
+    
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Shared HTTP session for tool API calls (mount adapters here to change retries)"""
+        return _SESSION
     
     
     # --- Weather ---
-    def get_fishing_weather(self, location: str, days: int = 5) -> Dict:
+    def get_fishing_weather(self, location: str = "Hobart", days: int = 5) -> Dict:
             """
             Get weather forecast and fishing conditions for multiple days
             
@@ -77,110 +204,179 @@ class ToolsModel:
             # Limit to 5 days (OpenWeatherMap free tier supports up to 5 days)
             days = min(max(days, 1), 5)
             
+            # Format location for API
+            location_query = f"{location},Tasmania,AU"
+            
+            # Serve a fresh cached forecast if we have one (errors are never cached)
+            cache_key = (self.weather_provider, " ".join(location_query.lower().split()), days)
+            cached = self._get_cached_forecast(cache_key)
+            if cached is not None:
+                return cached
+            
             try:
-                # Format location for API
-                location_query = f"{location},Tasmania,AU"
-                
                 if self.weather_provider == "openweathermap":
-                    return self._get_openweathermap_forecast(location_query, location, days)
+                    result = self._get_openweathermap_forecast(location_query, location, days)
                 else:
                     return self._err("get_fishing_weather", "weather_provider_error", TOOL_ERROR_MESSAGES['weather_error'])
                 
             except Exception as e:
                 print(f"Weather API error: {e}")
+                
+                # Stale forecast beats no forecast when the API is down
+                stale = self._get_cached_forecast(cache_key, allow_stale=True)
+                if stale is not None:
+                    return stale
                 return self._err("get_fishing_weather", "error", TOOL_ERROR_MESSAGES['weather_error'])
+            
+            if result.get("success"):
+                self._store_forecast(cache_key, result)
+            return result
+    
+    
+    def _get_cached_forecast(self, key: tuple, allow_stale: bool = False) -> Optional[Dict]:
+        """
+        Return a copy of a cached forecast, or None if missing (or expired)
+        
+        With allow_stale, entries up to max_stale_sec old are returned too,
+        trimmed to today onwards and marked as stale.
+        """
+        with self._wx_lock:
+            entry = self._wx_cache.get(key)
+        
+        if entry is None:
+            return None
+        
+        fetched_at, result = entry
+        age = time.monotonic() - fetched_at
+        if age > (self.weather_max_stale if allow_stale else self.weather_cache_ttl):
+            return None
+        
+        result = copy.deepcopy(result)
+        if age > self.weather_cache_ttl:
+            return self._mark_stale_forecast(result, age)
+        return result
+    
+    
+    def _mark_stale_forecast(self, result: Dict, age: float) -> Optional[Dict]:
+        """Helper: Drop past days from an old forecast, re-rate it and flag it as stale"""
+        data = result["data"]
+        today_local = _iso_date_from_day((int(time.time()) + data.get("utc_offset_sec", 0)) // 86400)
+        
+        forecasts = [f for f in data["forecasts"] if f["date"] >= today_local]
+        if not forecasts:
+            return None
+        
+        # max() keeps the earliest day on ties, like the forecast loop
+        best_day = self._find_best_fishing_day(max(forecasts, key=lambda f: f["fishing_score"]))
+        data.update({
+            "forecast_days": len(forecasts),
+            "forecasts": forecasts,
+            "best_fishing_day": best_day,
+            "recommendation": self._assess_multi_day_forecast(forecasts, best_day),
+            "stale": True,
+            "stale_minutes": int(age // 60),
+        })
+        result["stale"] = True
+        return result
+    
+    
+    def _store_forecast(self, key: tuple, result: Dict):
+        """Cache a successful forecast, evicting the oldest entry when full"""
+        with self._wx_lock:
+            self._wx_cache.pop(key, None)
+            self._wx_cache[key] = (time.monotonic(), copy.deepcopy(result))
+            while len(self._wx_cache) > self.weather_cache_size:
+                self._wx_cache.pop(next(iter(self._wx_cache)))
            
             
     def _get_openweathermap_forecast(self, location_query: str, location: str, days: int) -> Dict:
         """Fetch and process OpenWeatherMap forecast data"""
-        url = f"{self.weather_base_url}/forecast"
-        params = {
-            "q": location_query,
-            "appid": self.weather_api_key,
-            "units": "metric",
-        }
+        # cnt: 3-hour steps, enough to cover `days` local days
+        url = f"{self._forecast_url}&q={quote_plus(location_query)}&cnt={days * 8}"
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self.get_session().get(url, timeout=(3.05, 10))
         response.raise_for_status()
         data = response.json()
 
         # Get timezone offset from API
-        tz_offset_sec = (data.get("city", {}) or {}).get("timezone", 0)
-        tz_offset = timedelta(seconds=tz_offset_sec)
+        tz_offset_sec = int((data.get("city", {}) or {}).get("timezone", 0))
 
         # Group forecast data by local date
         daily_data = {}  # date_str -> accumulators
         for item in data.get("list", []):
-            # Convert UTC timestamp to local time
-            ts_utc = datetime.fromtimestamp(item["dt"], tz=timezone.utc)
-            local_dt = ts_utc + tz_offset
-            date = local_dt.date().isoformat()
+            # Local date from the UTC epoch (a forecast spans only a few distinct days)
+            date = _iso_date_from_day((item["dt"] + tz_offset_sec) // 86400)
 
-            # Initialize daily accumulator
-            daily_data.setdefault(date, {
-                "temps": [], 
-                "conditions": [], 
-                "wind_speeds": [], 
-                "rain": 0.0, 
-                "humidity": []
-            })
+            # Initialize daily accumulator (running totals, no per-item lists)
+            d = daily_data.get(date)
+            if d is None:
+                d = daily_data[date] = {
+                    "n": 0,
+                    "temp_sum": 0.0,
+                    "temp_min": math.inf,
+                    "temp_max": -math.inf,
+                    "wind_sum": 0.0,
+                    "humidity_sum": 0.0,
+                    "rain": 0.0,
+                    "conditions": Counter()
+                }
             
             # Accumulate data
-            d = daily_data[date]
-            d["temps"].append(item["main"]["temp"])
-            d["conditions"].append(item["weather"][0]["description"])
-            d["wind_speeds"].append(item["wind"]["speed"])
-            d["humidity"].append(item["main"]["humidity"])
+            temp = item["main"]["temp"]
+            d["n"] += 1
+            d["temp_sum"] += temp
+            if temp < d["temp_min"]:
+                d["temp_min"] = temp
+            if temp > d["temp_max"]:
+                d["temp_max"] = temp
+            d["wind_sum"] += item["wind"]["speed"]
+            d["humidity_sum"] += item["main"]["humidity"]
+            d["conditions"][item["weather"][0]["description"]] += 1
             if "rain" in item:
                 d["rain"] += float(item["rain"].get("3h", 0.0))
 
-        # Select days to return (starting from today)
-        ordered_dates = sorted(daily_data.keys())
-        now_local = datetime.now(timezone.utc) + tz_offset
-        today_local = now_local.date().isoformat()
-        
-        # Get dates starting from today
-        future_dates = [d for d in ordered_dates if d >= today_local]
-        selected_dates = future_dates[:days]
+        # Select days to return: the first `days` dates starting from today
+        today_local = _iso_date_from_day((int(time.time()) + tz_offset_sec) // 86400)
+        selected_dates = islice((d for d in sorted(daily_data) if d >= today_local), days)
 
         # Build daily summaries with fishing scores
         forecasts = []
+        best = None
         for date in selected_dates:
             d = daily_data[date]
             
-            # Calculate averages
-            avg_temp = sum(d["temps"]) / len(d["temps"])
-            max_temp = max(d["temps"])
-            min_temp = min(d["temps"])
-            avg_wind = sum(d["wind_speeds"]) / len(d["wind_speeds"])
-            avg_humidity = sum(d["humidity"]) / len(d["humidity"])
-            conditions = max(set(d["conditions"]), key=d["conditions"].count)
+            n = d["n"]
             
             # Create daily forecast
             daily_forecast = {
                 "date": date,
-                "temp_avg_c": round(avg_temp, 1),
-                "temp_max_c": round(max_temp, 1),
-                "temp_min_c": round(min_temp, 1),
-                "conditions": conditions,
-                "wind_speed_kmh": round(avg_wind * 3.6, 1),  # m/s -> km/h
+                "temp_avg_c": round(d["temp_sum"] / n, 1),
+                "temp_max_c": round(d["temp_max"], 1),
+                "temp_min_c": round(d["temp_min"], 1),
+                "conditions": d["conditions"].most_common(1)[0][0],
+                "wind_speed_kmh": round(d["wind_sum"] / n * 3.6, 1),  # m/s -> km/h
                 "rainfall_mm": round(d["rain"], 1),
-                "humidity_percent": round(avg_humidity, 0)
+                "humidity_percent": round(d["humidity_sum"] / n, 0)
             }
             
             # Add fishing assessment for this day
             daily_forecast["fishing_score"] = self._calculate_fishing_score(daily_forecast)
             
             forecasts.append(daily_forecast)
+            
+            # Track the best day as we go (earliest wins ties)
+            if best is None or daily_forecast["fishing_score"] > best["fishing_score"]:
+                best = daily_forecast
 
-        # Find best fishing day
-        best_day = self._find_best_fishing_day(forecasts)
+        # Rate the best fishing day
+        best_day = self._find_best_fishing_day(best)
         
         # Overall assessment
         overall_assessment = self._assess_multi_day_forecast(forecasts, best_day)
         
         return self._ok("get_fishing_weather", {
             "location": location,
+            "utc_offset_sec": tz_offset_sec,
             "forecast_days": len(forecasts),
             "forecasts": forecasts,
             "best_fishing_day": best_day,
@@ -195,63 +391,25 @@ class ToolsModel:
         Returns:
             int: Score from 0 (worst) to 10 (best)
         """
-        score = 0
-        
-        # Temperature scoring (ideal: 10-25°C)
-        temp = forecast['temp_avg_c']
-        if 10 <= temp <= 25:
-            score += 4  # Ideal temperature
-        elif 5 <= temp < 10 or 25 < temp <= 30:
-            score += 2  # Acceptable temperature
-        elif 0 <= temp < 5 or 30 < temp <= 35:
-            score += 1  # Marginal temperature
-        # else: 0 points for extreme temperatures
-        
-        # Wind scoring (ideal: < 20 km/h)
-        wind = forecast['wind_speed_kmh']
-        if wind < 15:
-            score += 3  # Light winds - ideal
-        elif 15 <= wind < 25:
-            score += 2  # Moderate winds - acceptable
-        elif 25 <= wind < 35:
-            score += 1  # Strong winds - challenging
-        # else: 0 points for very strong winds
-        
-        # Rain scoring (ideal: < 5mm)
-        rain = forecast['rainfall_mm']
-        if rain < 2:
-            score += 3  # Dry - ideal
-        elif 2 <= rain < 10:
-            score += 2  # Light rain - acceptable
-        elif 10 <= rain < 20:
-            score += 1  # Moderate rain - marginal
-        # else: 0 points for heavy rain
+        # Temperature: 4 ideal (10-25°C), 2 acceptable, 1 marginal, 0 extreme
+        score = _TEMP_POINTS[bisect.bisect_right(_TEMP_EDGES, forecast['temp_avg_c'])]
+        
+        # Wind: 3 light (< 15 km/h), 2 moderate, 1 strong, 0 very strong (>= 35)
+        score += _WIND_POINTS[bisect.bisect_right(_WIND_EDGES, forecast['wind_speed_kmh'])]
+        
+        # Rain: 3 dry (< 2mm), 2 light, 1 moderate, 0 heavy (>= 20mm)
+        score += _RAIN_POINTS[bisect.bisect_right(_RAIN_EDGES, forecast['rainfall_mm'])]
         
         return min(score, 10)  # Cap at 10
     
     
-    def _find_best_fishing_day(self, forecasts: List[Dict]) -> Dict:
-        """Find the best day for fishing based on scores"""
-        if not forecasts:
+    def _find_best_fishing_day(self, best: Dict) -> Dict:
+        """Readable assessment of the best-scoring day's forecast"""
+        if not best:
             return None
         
-        # Find day with highest fishing score
-        best = max(forecasts, key=lambda f: f['fishing_score'])
-        
-        # Create readable assessment
         score = best['fishing_score']
-        if score >= 8:
-            rating = "Excellent"
-            emoji = "🎣✨"
-        elif score >= 6:
-            rating = "Good"
-            emoji = "🎣"
-        elif score >= 4:
-            rating = "Fair"
-            emoji = "⚠️"
-        else:
-            rating = "Poor"
-            emoji = "❌"
+        rating, emoji = next((r, e) for min_score, r, e in _RATINGS if score >= min_score)
         
         return {
             "date": best['date'],
@@ -272,96 +430,117 @@ class ToolsModel:
         
         avg_score = sum(f['fishing_score'] for f in forecasts) / len(forecasts)
         
-        if avg_score >= 7:
-            outlook = "Great week ahead for fishing!"
-        elif avg_score >= 5:
-            outlook = "Generally good conditions expected"
-        elif avg_score >= 3:
-            outlook = "Mixed conditions throughout the period"
-        else:
-            outlook = "Challenging conditions expected"
+        outlook = _OUTLOOKS[bisect.bisect_right(_OUTLOOK_EDGES, avg_score)]
         
         return f"{outlook} Best day: {best_day['date']} ({best_day['rating']})"
-         
-        
-    def _assess_fishing_conditions(self, forecast: Optional[Dict]) -> Dict:
+    
+    
+    def _format_weather_message(self, data: Dict, params: Dict = None) -> Optional[str]:
         """
-        Legacy method - Assess if weather is good for fishing (single day)
-        Kept for backward compatibility
+        Format a get_fishing_weather result as a Markdown answer
+        
+        params are the routed tool params: a day_offset ("tomorrow" -> 1)
+        shows just that day. Returns None when the requested day is not in
+        the forecast, so the caller can let the LLM answer instead.
         """
-        if not forecast:
-            return {
-                "rating": "Unknown",
-                "explanation": "No forecast data available"
-            }
+        day_offset = (params or {}).get('day_offset')
+        if day_offset is not None:
+            return self._format_single_day_message(data, day_offset)
         
-        score = 0
-        factors = []
-        
-        # Temperature (ideal: 10-25°C)
-        temp = forecast['temp_avg_c']
-        if 10 <= temp <= 25:
-            score += 3
-            factors.append("✅ Good temperature")
-        elif 5 <= temp < 10 or 25 < temp <= 30:
-            score += 1
-            factors.append("⚠️ Moderate temperature")
-        else:
-            factors.append("❌ Extreme temperature")
-        
-        # Wind (ideal: < 20 km/h)
-        wind = forecast['wind_speed_kmh']
-        if wind < 15:
-            score += 3
-            factors.append("✅ Light winds")
-        elif 15 <= wind < 25:
-            score += 1
-            factors.append("⚠️ Moderate winds")
-        else:
-            factors.append("❌ Strong winds")
-        
-        # Rain (ideal: < 5mm)
-        rain = forecast['rainfall_mm']
-        if rain < 2:
-            score += 2
-            factors.append("✅ Dry conditions")
-        elif 2 <= rain < 10:
-            score += 1
-            factors.append("⚠️ Light rain possible")
-        else:
-            factors.append("❌ Heavy rain expected")
-        
-        # Determine rating
-        if score >= 7:
-            rating = "Excellent"
-            emoji = "🎣✨"
-        elif score >= 5:
-            rating = "Good"
-            emoji = "🎣"
-        elif score >= 3:
-            rating = "Fair"
-            emoji = "⚠️"
-        else:
-            rating = "Poor"
-            emoji = "❌"
+        message_parts = [_HEADER_TMPL.format_map(data)]
         
-        return {
-            "rating": rating,
-            "emoji": emoji,
-            "score": score,
-            "factors": factors
-        }
+        # Cached forecast served while the API is down
+        if data.get('stale'):
+            message_parts.append(_STALE_TMPL.format_map(data))
+        
+        # Highlight best day
+        best_day = data.get('best_fishing_day')
+        if best_day:
+            message_parts.append(_BEST_DAY_TMPL.format_map({**best_day, "day": datetime.fromisoformat(best_day['date'])}))
+        
+        # Daily breakdown
+        message_parts.extend(
+            _DAY_TMPL.format_map({**forecast, "day": datetime.fromisoformat(forecast['date'])})
+            for forecast in data['forecasts']
+        )
+        
+        return "\n".join(message_parts)
     
     
+    def _format_single_day_message(self, data: Dict, day_offset) -> Optional[str]:
+        """Helper: Markdown answer for one forecast day (day_offset days from today)"""
+        if isinstance(day_offset, bool):
+            return None
+        try:
+            day_offset = int(day_offset)
+        except (TypeError, ValueError):
+            return None
+        
+        today = (int(time.time()) + data.get('utc_offset_sec', 0)) // 86400
+        target_date = _iso_date_from_day(today + day_offset)
+        forecast = next((f for f in data['forecasts'] if f['date'] == target_date), None)
+        if forecast is None:
+            return None
+        
+        score = forecast['fishing_score']
+        rating, emoji = next((r, e) for min_score, r, e in _RATINGS if score >= min_score)
+        message = _SINGLE_DAY_TMPL.format_map({
+            **forecast,
+            "location": data['location'],
+            "rating": rating,
+            "emoji": emoji,
+            "day": datetime.fromisoformat(forecast['date']),
+        })
+        
+        if data.get('stale'):
+            message += "\n" + _STALE_TMPL.format_map(data)
+        return message
+         
+        
     def call_tool(self, tool_name: str, **kwargs) -> Dict:
         """Call a tool by name with parameters"""
-        if tool_name == "get_fishing_weather":
-            return self.get_fishing_weather(
-                location=kwargs.get("location", "Hobart"),
-                days=kwargs.get("days", 5)
-            )
-            
-        return self._err(tool_name, "unknown_tool", f"Unknown tool: {tool_name}")
+        fn = self._tool_registry.get(tool_name)
+        if fn is None:
+            return self._err(tool_name, "unknown_tool", f"Unknown tool: {tool_name}")
+        
+        # Drop extra params the LLM may add (e.g. day_offset); tool defaults fill the rest
+        accepted = self._tool_params[tool_name]
+        params = {k: v for k, v in kwargs.items() if k in accepted}
+        
+        validator = self._tool_validators.get(tool_name)
+        if validator is not None:
+            try:
+                params = validator(params)
+            except ValueError as e:
+                return self._err(tool_name, "bad_params", str(e))
+        
+        return fn(**params)
+    
+    
+    def _validate_weather_params(self, params: Dict) -> Dict:
+        """Validate get_fishing_weather params (location: non-empty str, days: int-like)"""
+        validated = {}
+        
+        location = params.get("location")
+        if location is not None:
+            if not isinstance(location, str) or not location.strip():
+                raise ValueError(f"location must be a non-empty string, got {location!r}")
+            validated["location"] = location.strip()
+        
+        days = params.get("days")
+        if days is not None:
+            if isinstance(days, bool):
+                raise ValueError(f"days must be an integer, got {days!r}")
+            try:
+                # accepts 5, 5.0, "5" and "5.0"; rejects 5.5, "5.5", inf and nan
+                number = float(days) if isinstance(days, str) else days
+                if isinstance(number, float) and not number.is_integer():
+                    raise ValueError
+                validated["days"] = int(number)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"days must be an integer, got {days!r}")
+        
+        return validated
     
     
     def get_tool_descriptions(self) -> List[Dict]: